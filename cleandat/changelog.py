@@ -1,5 +1,11 @@
 import itertools
 
+from pandas import DataFrame
+
+# column and value markers used for entries describing a row that was removed as a whole
+REMOVED_ROW_COLUMN = '*'
+REMOVED_ROW_VALUE = 'removed'
+
 
 class ChangedEntry:
 
@@ -22,6 +28,16 @@ class ChangeLog:
     def add_entry(self, entry: ChangedEntry):
         self.entries.append(entry)
 
+    def add_removed_rows(self, applied_function: str, removed_rows: DataFrame):
+        """Adds one entry per row that was removed entirely by a transformation step.
+
+        :param applied_function: The name of the function that removed the rows
+        :param removed_rows: The removed rows, indexed by their original row index
+        """
+        for row_idx, row in removed_rows.iterrows():
+            self.add_entry(ChangedEntry(applied_function, REMOVED_ROW_COLUMN, row_idx,
+                                        str(row.tolist()), REMOVED_ROW_VALUE))
+
     def pretty_print(self):
         for entry in self.entries:
             print(f'[{entry.id}] {entry.applied_function}: '
@@ -1,8 +1,11 @@
 import re
+from typing import Iterable, Iterator
+
 import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
+from cleandat.changelog import ChangeLog
 from cleandat.constants import MISSING_DATA_TOKENS
 
 
@@ -58,6 +61,154 @@ def drop_empty_columns(df: DataFrame) -> DataFrame:
     return df
 
 
+def normalize_key_columns(df: DataFrame, columns: list[str] = None) -> DataFrame:
+    """Returns a normalized copy of the key columns used for duplicate detection.
+
+    String entries are stripped, case-folded and runs of whitespace are collapsed to a single blank, so that e.g.
+    ' John  Doe' and 'john doe' are considered equal. Non-string columns are left untouched.
+
+    :param df: The dataframe containing the key columns
+    :param columns: List of key columns. Will use all columns if None (default).
+    :return: A dataframe containing only the normalized key columns
+    """
+    selected_columns = df.columns if columns is None else columns
+    normalized = df[selected_columns].copy()
+    for column in selected_columns:
+        if normalized[column].dtype == 'object' or pd.api.types.is_string_dtype(normalized[column]):
+            normalized[column] = normalized[column].astype('string').str.strip().str.casefold() \
+                .str.replace(r'\s+', ' ', regex=True)
+    return normalized
+
+
+def hash_rows(df: DataFrame, columns: list[str] = None, normalize: bool = False) -> np.ndarray:
+    """Computes a 64-bit hash for each row of the dataframe, vectorized over all rows.
+
+    The hash does not depend on the dtypes pandas inferred for the key columns: numeric entries are hashed by their
+    value and all other entries by their string representation. So e.g. 70, 70.0 and '70' hash equally, which keeps
+    hashes comparable between chunks of pd.read_csv that were read with different dtypes.
+
+    :param df: The dataframe to be hashed
+    :param columns: List of key columns the hash is computed from. Will use all columns if None (default).
+    :param normalize: If True, hash the normalized key columns (see normalize_key_columns)
+    :return: An array of uint64 hashes, one per row
+    """
+    selected_columns = df.columns if columns is None else columns
+    keys = normalize_key_columns(df, selected_columns) if normalize else df[selected_columns]
+    keys = keys.apply(_canonical_key_column)
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
+
+
+def _canonical_key_column(column: pd.Series) -> pd.Series:
+    # string representation of each entry that is the same no matter which dtype the column was read with
+    if pd.api.types.is_integer_dtype(column):
+        # keep the exact digits of large integers (e.g. IDs), which float64 can not represent
+        return column.astype(object).where(column.notna(), np.nan).map(str, na_action='ignore')
+    numbers = column if pd.api.types.is_numeric_dtype(column) else pd.to_numeric(column, errors='coerce')
+    numbers = numbers.astype('float64')
+    is_integral = (numbers % 1 == 0) & (numbers.abs() < 2 ** 63)
+    is_fractional = numbers.notna() & ~is_integral
+    is_text = column.notna() & numbers.isna()
+    canonical = pd.Series(np.nan, index=column.index, dtype=object)
+    canonical[is_integral.to_numpy()] = numbers[is_integral].astype('int64').astype(str)
+    canonical[is_fractional.to_numpy()] = numbers[is_fractional].astype(str)
+    canonical[is_text.to_numpy()] = column[is_text].astype(str)
+    return canonical
+
+
+def identify_duplicate_rows(df: DataFrame, columns: list[str] = None, normalize: bool = True,
+                            seen_hashes: np.ndarray = None) -> list[int]:
+    """Identifies rows that duplicate an earlier row of the dataframe.
+
+    The first occurrence of a row is kept, all later occurrences are reported. With normalize=False only exact
+    duplicates are found, otherwise rows that only differ in whitespace or case are reported as well.
+
+    :param df: The dataframe to be analyzed
+    :param columns: List of key columns that identify a record. Will use all columns if None (default).
+    :param normalize: If True (default), compare the normalized key columns instead of the raw values
+    :param seen_hashes: Sorted array of row hashes seen in previous chunks, rows matching one of them are reported
+    as duplicates as well
+    :return: Row positions (not index labels) of duplicate rows
+    """
+    seen = None if seen_hashes is None else _HashSet([seen_hashes])
+    is_duplicate, _ = _identify_duplicates(df, columns, normalize, seen)
+    return np.flatnonzero(is_duplicate).tolist()
+
+
+def drop_duplicate_rows(df: DataFrame, columns: list[str] = None, normalize: bool = True) -> DataFrame:
+    """Drops all rows that duplicate an earlier row of the dataframe, keeping the first occurrence.
+
+    :param df: The dataframe to be deduplicated
+    :param columns: List of key columns that identify a record. Will use all columns if None (default).
+    :param normalize: If True (default), rows that only differ in whitespace or case are considered duplicates
+    :return: The deduplicated dataframe
+    """
+    is_duplicate, _ = _identify_duplicates(df, columns, normalize)
+    return df[~is_duplicate]
+
+
+def drop_duplicate_rows_chunked(chunks: Iterable[DataFrame], columns: list[str] = None, normalize: bool = True,
+                                changelog: ChangeLog = None) -> Iterator[DataFrame]:
+    """Drops duplicate rows from a dataframe that is processed chunk by chunk, e.g. from pd.read_csv(chunksize=...).
+
+    Only the 64-bit hashes of the rows seen so far are kept in memory (as a few sorted arrays), so the full data never
+    has to be loaded at once. Duplicates are also detected across chunk borders.
+
+    :param chunks: The chunks of the dataframe, in order
+    :param columns: List of key columns that identify a record. Will use all columns if None (default).
+    :param normalize: If True (default), rows that only differ in whitespace or case are considered duplicates
+    :param changelog: If given, every removed row is logged to this changelog
+    :return: The deduplicated chunks
+    """
+    seen = _HashSet()
+    for chunk in chunks:
+        is_duplicate, hashes = _identify_duplicates(chunk, columns, normalize, seen)
+        if changelog is not None:
+            changelog.add_removed_rows(drop_duplicate_rows.__name__, chunk[is_duplicate])
+        seen.add(hashes[~is_duplicate])
+        yield chunk[~is_duplicate]
+
+
+def _identify_duplicates(df: DataFrame, columns: list[str], normalize: bool,
+                         seen: '_HashSet' = None) -> tuple[np.ndarray, np.ndarray]:
+    # boolean mask of the duplicate rows by position, together with the hashes of all rows
+    hashes = hash_rows(df, columns, normalize=normalize)
+    is_duplicate = pd.Series(hashes).duplicated(keep='first').to_numpy()
+    if seen is not None:
+        is_duplicate |= seen.contains(hashes)
+    return is_duplicate, hashes
+
+
+class _HashSet:
+    """Compact set of uint64 hashes, stored as sorted runs.
+
+    Each run is at least twice as large as the next one, so there are at most log2(n) runs to search and every hash
+    is only re-sorted log2(n) times while the set grows, instead of re-sorting all hashes on every insert.
+    """
+
+    def __init__(self, runs: list[np.ndarray] = None):
+        self.runs: list[np.ndarray] = [] if runs is None else [run for run in runs if len(run) > 0]
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            found |= _is_in_sorted(hashes, run)
+        return found
+
+    def add(self, hashes: np.ndarray):
+        """Adds hashes that are neither contained in the set nor duplicated among themselves."""
+        run = np.sort(hashes)
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]))
+        if len(run) > 0:
+            self.runs.append(run)
+
+
+def _is_in_sorted(values: np.ndarray, sorted_values: np.ndarray) -> np.ndarray:
+    positions = np.searchsorted(sorted_values, values)
+    positions[positions == len(sorted_values)] = 0
+    return sorted_values[positions] == values
+
+
 def remove_entries_with_inconsistent_datatypes(df: DataFrame, threshold: float = 0.1) -> DataFrame:
     """ Removes entries that seem inconsistent with the rest of the column (e.g. string values in columns containing
     >90% numbers) and replace them with NaN.
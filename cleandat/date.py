@@ -1,10 +1,55 @@
+from concurrent.futures import ProcessPoolExecutor
+
 import dateparser
 import numpy as np
 import pandas as pd
+from dateparser.date import DateDataParser
 from pandas import DataFrame
 
+# parser of a worker process, initialized once per worker by _init_date_parser
+_date_parser: DateDataParser = None
+
+
+def _init_date_parser(settings: dict = None):
+    global _date_parser
+    _date_parser = DateDataParser(settings=settings)
+
+
+def _parse_date_chunk(values: list[str]) -> list:
+    parsed = []
+    for value in values:
+        date_data = _date_parser.get_date_data(value)
+        parsed.append(date_data['date_obj'] if date_data else None)
+    return parsed
 
-def identify_date_columns(df: DataFrame, threshold: float = 0.5) -> list:
+
+def parse_distinct_dates(values, settings: dict = None, n_workers: int = None, chunk_size: int = 1000) -> dict:
+    """Parses each distinct value once, optionally in chunks across a pool of worker processes.
+
+    dateparser is pure Python, so parsing millions of distinct free-text timestamps is bound to a single core. With
+    n_workers > 1 the distinct values are split into chunks of chunk_size that are parsed in parallel, each worker
+    initializing its dateparser instance only once.
+
+    :param values: The values to be parsed, duplicates are only parsed once
+    :param settings: dateparser settings, e.g. {'DATE_ORDER': 'DMY'}
+    :param n_workers: Number of worker processes, parse in the current process if None or 1 (default)
+    :param chunk_size: Number of values sent to a worker at once
+    :return: For each distinct value, the parsed datetime or None if it can not be interpreted as a date
+    """
+    distinct_values = list(dict.fromkeys(values))
+    chunks = [distinct_values[start:start + chunk_size] for start in range(0, len(distinct_values), chunk_size)]
+    if n_workers is None or n_workers <= 1 or len(chunks) <= 1:
+        _init_date_parser(settings)
+        parsed_chunks = map(_parse_date_chunk, chunks)
+        return dict(zip(distinct_values, [date for chunk in parsed_chunks for date in chunk]))
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_date_parser, initargs=(settings,)) as executor:
+        # map returns the results in the order of the chunks
+        parsed_chunks = executor.map(_parse_date_chunk, chunks)
+        return dict(zip(distinct_values, [date for chunk in parsed_chunks for date in chunk]))
+
+
+def identify_date_columns(df: DataFrame, threshold: float = 0.5, n_workers: int = None,
+                          chunk_size: int = 1000) -> list:
     """Identifies columns that are likely to contain date entries.
 
     Heuristic: if a column contains a large number of date entries, it is likely that the column is a date column
@@ -12,8 +57,13 @@ def identify_date_columns(df: DataFrame, threshold: float = 0.5) -> list:
 
     :param df: The dataframe to be analyzed
     :param threshold: The percentage of entries that have to be dates for a column to be considered a date column
+    :param n_workers: If given, parse the distinct entries of all columns across this many worker processes instead
+    of parsing every entry in the current process (see parse_distinct_dates)
+    :param chunk_size: Number of distinct entries sent to a worker at once
     :return: A list of column names that are likely to contain date entries
     """
+    if n_workers is not None:
+        return _identify_date_columns_distinct(df, threshold, n_workers, chunk_size)
     date_columns = []
     for column in df:
         if df[column].dtype == 'object':
@@ -32,6 +82,25 @@ def identify_date_columns(df: DataFrame, threshold: float = 0.5) -> list:
     return date_columns
 
 
+def _identify_date_columns_distinct(df: DataFrame, threshold: float, n_workers: int, chunk_size: int) -> list:
+    # count each distinct entry per column, so that every distinct entry of the dataframe is only parsed once
+    entry_counts = {}
+    for column in df:
+        if df[column].dtype == 'object':
+            entries = df[column][df[column].notna()].astype(str)
+            entry_counts[column] = entries[~entries.str.isnumeric()].value_counts()
+    parsed = parse_distinct_dates([entry for counts in entry_counts.values() for entry in counts.index],
+                                  n_workers=n_workers, chunk_size=chunk_size)
+    date_columns = []
+    for column, counts in entry_counts.items():
+        pro_date_heuristic = counts[[parsed[entry] is not None for entry in counts.index]].sum()
+        # take empty cell (nan) values out of the consideration
+        num_nan = df[column].isna().sum()
+        if pro_date_heuristic > threshold * (len(df[column]) - num_nan):
+            date_columns.append(column)
+    return date_columns
+
+
 def create_durational_column(df: DataFrame, date_col_start: str, date_col_end: str, new_col_name: str, remove_dates: bool = True) -> DataFrame:
     """Creates a new column containing the duration between two date columns in days.
 
@@ -49,7 +118,7 @@ def create_durational_column(df: DataFrame, date_col_start: str, date_col_end: s
 
 
 def normalize_date_entries(df: DataFrame, date_columns: list[str], date_order: str = 'DMY',
-                           remove_unparsable=True) -> DataFrame:
+                           remove_unparsable=True, n_workers: int = None, chunk_size: int = 1000) -> DataFrame:
     """Replace all date entries with a uniform format.
 
     Reformat all date entries to a uniform format - dates may be written in different formats,
@@ -59,8 +128,18 @@ def normalize_date_entries(df: DataFrame, date_columns: list[str], date_order: s
     :param date_order: The order of the date entries, e.g. DMY for 01.01.2020 or MDY for January 1st, 2020
     :param df: The dataframe to be reformatted
     :param date_columns: List of column names containing date entries
+    :param n_workers: If given, parse the distinct entries of the date columns across this many worker processes
+    instead of parsing every entry in the current process (see parse_distinct_dates)
+    :param chunk_size: Number of distinct entries sent to a worker at once
     :return: The reformatted dataframe
     """
+    if n_workers is not None:
+        entries = [str(x) for col in date_columns for x in df[col].dropna().unique()]
+        parsed = parse_distinct_dates(entries, {'DATE_ORDER': date_order}, n_workers, chunk_size)
+        for col in date_columns:
+            df[col] = df[col].apply(lambda x: parsed[str(x)] if not pd.isnull(x) and parsed[str(x)] is not None
+                                    else np.nan if remove_unparsable else x)
+        return df
     for col in date_columns:
         df[col] = df[col].apply(lambda x: dateparser.parse(str(x), settings={'DATE_ORDER': date_order})
         if not pd.isnull(x) and dateparser.parse(str(x), settings={'DATE_ORDER': date_order}) is not None else np.nan
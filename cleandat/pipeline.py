@@ -25,13 +25,21 @@ class TransformationPipeline:
         return self.data
 
     def _extend_changelog(self, transformation_step: Callable, df_before: DataFrame, df_after: DataFrame):
+        function_name = transformation_step.__name__
+        # rows dropped by the step can not be compared cell-wise, log them as removed rows instead
+        if len(df_before) != len(df_after) and not df_before.index.is_unique:
+            raise ValueError(f'{function_name} removed rows from a dataframe with a non-unique index, which can not '
+                             f'be tracked in the changelog - reset the index first')
+        removed_rows = df_before.index.difference(df_after.index)
+        if len(removed_rows) > 0:
+            self.changelog.add_removed_rows(function_name, df_before.loc[removed_rows])
+            df_before = df_before.drop(index=removed_rows)
         diff = df_before.compare(df_after)
         different_columns = {x[0] for x in diff.columns}
         for column in different_columns:
             for row_idx in diff[column].index:
                 value_before = str(diff[column].loc[row_idx, 'self'])
                 value_after = str(diff[column].loc[row_idx, 'other'])
-                function_name = transformation_step.__name__
                 log_entry = ChangedEntry(function_name, column, row_idx, value_before, value_after)
                 self.changelog.add_entry(log_entry)
 
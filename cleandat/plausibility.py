@@ -0,0 +1,289 @@
+import math
+from typing import Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from cleandat.changelog import ChangedEntry, ChangeLog
+
+# relative padding of the bucket edges, so that rounding errors when computing bucket keys never move a value outside
+_EDGE_PADDING = 1e-9
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative accuracy guarantees, built in a single pass over the data.
+
+    Values are counted in logarithmically sized buckets, so every quantile is estimated with a relative error of at
+    most relative_accuracy while the memory usage only depends on the range of the values, not on their number.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-9):
+        self.relative_accuracy: float = relative_accuracy
+        self.gamma: float = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.min_value: float = min_value
+        self.positive_buckets: dict[int, int] = {}
+        self.negative_buckets: dict[int, int] = {}
+        self.zero_count: int = 0
+        self.count: int = 0
+
+    def update(self, values) -> 'QuantileSketch':
+        """Adds all non-NaN values to the sketch.
+
+        :param values: Array-like of numeric values
+        :return: The updated sketch
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        is_zero = np.abs(values) < self.min_value
+        self.zero_count += int(is_zero.sum())
+        self._add_to_buckets(self.positive_buckets, values[~is_zero & (values > 0)])
+        self._add_to_buckets(self.negative_buckets, -values[~is_zero & (values < 0)])
+        self.count += len(values)
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Merges the counts of another sketch with the same relative accuracy into this sketch.
+
+        :param other: The sketch to be merged
+        :return: The merged sketch
+        """
+        if other.gamma != self.gamma:
+            raise ValueError('Only sketches with the same relative accuracy can be merged')
+        for key, count in other.positive_buckets.items():
+            self.positive_buckets[key] = self.positive_buckets.get(key, 0) + count
+        for key, count in other.negative_buckets.items():
+            self.negative_buckets[key] = self.negative_buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Estimates the q-quantile of all values added so far.
+
+        :param q: The quantile, between 0 and 1
+        :return: The estimated quantile, NaN if the sketch is empty
+        """
+        values, _, _, counts = self._buckets()
+        if len(values) == 0:
+            return np.nan
+        return float(values[_quantile_index(counts, q)])
+
+    def quantile_bounds(self, q: float) -> tuple[float, float]:
+        """Returns a lower and an upper bound of the exact q-quantile of all values added so far.
+
+        The bounds are the edges of the buckets holding the values the exact quantile is interpolated from, so they are
+        at most relative_accuracy further apart than the values themselves.
+
+        :param q: The quantile, between 0 and 1
+        :return: The lower and upper bound, both NaN if the sketch is empty
+        """
+        _, lower_edges, upper_edges, counts = self._buckets()
+        if len(counts) == 0:
+            return np.nan, np.nan
+        return float(lower_edges[_quantile_index(counts, q)]), \
+            float(upper_edges[_quantile_index(counts, q, round_up=True)])
+
+    def median_absolute_deviation(self) -> float:
+        """Estimates the median absolute deviation (MAD) of all values added so far.
+
+        :return: The estimated MAD, NaN if the sketch is empty
+        """
+        values, _, _, counts = self._buckets()
+        if len(values) == 0:
+            return np.nan
+        deviations = np.abs(values - values[_quantile_index(counts, 0.5)])
+        order = np.argsort(deviations)
+        return float(deviations[order][_quantile_index(counts[order], 0.5)])
+
+    def median_absolute_deviation_bound(self) -> float:
+        """Returns an upper bound of the exact median absolute deviation (MAD) of all values added so far.
+
+        :return: The upper bound, NaN if the sketch is empty
+        """
+        _, lower_edges, upper_edges, counts = self._buckets()
+        if len(counts) == 0:
+            return np.nan
+        median_lower, median_upper = self.quantile_bounds(0.5)
+        # largest deviation any value of a bucket can have from any median within the bounds
+        deviations = np.maximum(np.maximum(upper_edges - median_lower, median_upper - lower_edges), 0)
+        order = np.argsort(deviations)
+        return float(deviations[order][_quantile_index(counts[order], 0.5, round_up=True)])
+
+    def _add_to_buckets(self, buckets: dict[int, int], values: np.ndarray):
+        if len(values) == 0:
+            return
+        keys, counts = np.unique(np.ceil(np.log(values) / math.log(self.gamma)).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def _buckets(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # representative value, lower and upper edge of each bucket in ascending order, together with the bucket counts
+        negative_keys = np.array(sorted(self.negative_buckets, reverse=True), dtype=np.int64)
+        positive_keys = np.array(sorted(self.positive_buckets), dtype=np.int64)
+        num_zero_buckets = 1 if self.zero_count else 0
+        values = np.concatenate([-self._representative_value(negative_keys), np.zeros(num_zero_buckets),
+                                 self._representative_value(positive_keys)])
+        lower_edges = np.concatenate([-self._upper_edge(negative_keys), np.full(num_zero_buckets, -self.min_value),
+                                      self._lower_edge(positive_keys)])
+        upper_edges = np.concatenate([-self._lower_edge(negative_keys), np.full(num_zero_buckets, self.min_value),
+                                      self._upper_edge(positive_keys)])
+        counts = np.concatenate([np.array([self.negative_buckets[key] for key in negative_keys.tolist()], dtype=float),
+                                 np.full(num_zero_buckets, self.zero_count, dtype=float),
+                                 np.array([self.positive_buckets[key] for key in positive_keys.tolist()], dtype=float)])
+        return values, lower_edges, upper_edges, counts
+
+    def _representative_value(self, keys: np.ndarray) -> np.ndarray:
+        return 2 * np.power(self.gamma, keys.astype(float)) / (self.gamma + 1)
+
+    def _lower_edge(self, keys: np.ndarray) -> np.ndarray:
+        return np.power(self.gamma, keys.astype(float) - 1) * (1 - _EDGE_PADDING)
+
+    def _upper_edge(self, keys: np.ndarray) -> np.ndarray:
+        return np.power(self.gamma, keys.astype(float)) * (1 + _EDGE_PADDING)
+
+
+def _quantile_index(counts: np.ndarray, q: float, round_up: bool = False) -> int:
+    # index of the bucket holding the value of rank q * (n - 1), rounded down or up for interpolated ranks
+    rank = q * (counts.sum() - 1)
+    rank = math.ceil(rank) if round_up else math.floor(rank)
+    return int(np.searchsorted(np.cumsum(counts), rank, side='right'))
+
+
+def build_quantile_sketches(chunks: Iterable[DataFrame], columns: list[str] = None,
+                            relative_accuracy: float = 0.01) -> dict[str, QuantileSketch]:
+    """Builds a quantile sketch for each numeric column in a single pass over the data.
+
+    Entries that can not be interpreted as numbers are ignored.
+
+    :param chunks: The dataframe or its chunks (e.g. from pd.read_csv(chunksize=...)), pass [df] for a single frame
+    :param columns: List of columns to be sketched. Will use all columns that are numeric in at least one chunk if None
+    (default) - chunks of pd.read_csv may read a numeric column as text when it contains a token like 'unknown'.
+    Columns missing from a chunk are skipped for this chunk.
+    :param relative_accuracy: The relative accuracy of the quantile estimates, default 0.01
+    :return: For each column, the quantile sketch of its values
+    """
+    sketches = {}
+    numeric_columns = set()
+    for chunk in chunks:
+        if columns is None:
+            # sketch all non-boolean columns, as a column that is text in this chunk may turn out numeric in a later one
+            selected_columns = chunk.select_dtypes(exclude='bool').columns
+            numeric_columns.update(chunk.select_dtypes('number').columns)
+        else:
+            selected_columns = [column for column in columns if column in chunk]
+        for column in selected_columns:
+            if column not in sketches:
+                sketches[column] = QuantileSketch(relative_accuracy)
+            sketches[column].update(pd.to_numeric(chunk[column], errors='coerce'))
+    if columns is None:
+        return {column: sketch for column, sketch in sketches.items() if column in numeric_columns}
+    return sketches
+
+
+def compute_plausible_ranges(sketches: dict[str, QuantileSketch], method: str = 'iqr', factor: float = None,
+                             clinical_ranges: dict[str, tuple] = None) -> dict[str, tuple]:
+    """Computes the range of plausible values for each sketched column from robust statistics.
+
+    With method 'iqr', values outside [Q1 - factor * IQR, Q3 + factor * IQR] are implausible (default factor 1.5).
+    With method 'mad', values outside median +/- factor * 1.4826 * MAD are implausible (default factor 3.5).
+    The statistics are taken from the bucket edges of the sketches, so the ranges always contain the ranges computed
+    from the exact statistics. Columns without spread (IQR or MAD of 0, e.g. constant or mostly binary columns) get no
+    range. Ranges given in clinical_ranges take precedence over the computed ones.
+
+    :param sketches: For each column, the quantile sketch of its values
+    :param method: Either 'iqr' or 'mad'
+    :param factor: Scales the width of the plausible range, defaults to 1.5 for 'iqr' and 3.5 for 'mad'
+    :param clinical_ranges: Known plausible ranges per column as (lower, upper), e.g. {'age': (0, 120)}. Either bound
+    may be None.
+    :return: For each column, the lower and upper bound of the plausible values
+    """
+    ranges = {}
+    for column, sketch in sketches.items():
+        if method == 'iqr':
+            if not sketch.quantile(0.75) - sketch.quantile(0.25) > 0:
+                continue
+            factor_iqr = 1.5 if factor is None else factor
+            q1, _ = sketch.quantile_bounds(0.25)
+            _, q3 = sketch.quantile_bounds(0.75)
+            ranges[column] = (q1 - factor_iqr * (q3 - q1), q3 + factor_iqr * (q3 - q1))
+        elif method == 'mad':
+            if not sketch.median_absolute_deviation() > 0:
+                continue
+            factor_mad = 3.5 if factor is None else factor
+            median_lower, median_upper = sketch.quantile_bounds(0.5)
+            mad = sketch.median_absolute_deviation_bound()
+            ranges[column] = (median_lower - factor_mad * 1.4826 * mad, median_upper + factor_mad * 1.4826 * mad)
+        else:
+            raise ValueError(f'Unknown method {method}, expected "iqr" or "mad"')
+    if clinical_ranges is not None:
+        ranges.update(clinical_ranges)
+    return ranges
+
+
+def identify_implausible_values(df: DataFrame, ranges: dict[str, tuple]) -> DataFrame:
+    """Identifies numeric entries outside their column's plausible range.
+
+    :param df: The dataframe to be analyzed
+    :param ranges: For each column, the lower and upper bound of the plausible values. Either bound may be None.
+    :return: boolean matrix with the same dimensions as the dataframe, where True indicates an implausible value
+    """
+    is_implausible_matrix = pd.DataFrame(False, index=df.index, columns=df.columns)
+    for column, (lower, upper) in ranges.items():
+        if column not in df:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        is_implausible = pd.Series(False, index=df.index)
+        if lower is not None and not pd.isna(lower):
+            is_implausible |= values < lower
+        if upper is not None and not pd.isna(upper):
+            is_implausible |= values > upper
+        is_implausible_matrix[column] = is_implausible
+    return is_implausible_matrix
+
+
+def remove_implausible_values(df: DataFrame, columns: list[str] = None, method: str = 'iqr', factor: float = None,
+                              clinical_ranges: dict[str, tuple] = None) -> DataFrame:
+    """Replaces numeric entries outside a robust (IQR/MAD) or user-provided plausible range with NaN.
+
+    Catches values of the right type that are still implausible, e.g. a weight of 7000 or a negative age.
+
+    :param df: The dataframe to be cleaned
+    :param columns: List of columns to be cleaned. Will apply to all numeric columns if None (default).
+    :param method: Either 'iqr' (default) or 'mad', see compute_plausible_ranges
+    :param factor: Scales the width of the plausible range, see compute_plausible_ranges
+    :param clinical_ranges: Known plausible ranges per column as (lower, upper), e.g. {'age': (0, 120)}
+    :return: The cleaned dataframe
+    """
+    sketches = build_quantile_sketches([df], columns)
+    ranges = compute_plausible_ranges(sketches, method, factor, clinical_ranges)
+    is_implausible = identify_implausible_values(df, ranges)
+    for column in ranges:
+        if column in df and is_implausible[column].any():
+            df[column] = df[column].mask(is_implausible[column])
+    return df
+
+
+def remove_implausible_values_chunked(chunks: Iterable[DataFrame], ranges: dict[str, tuple],
+                                      changelog: ChangeLog = None) -> Iterator[DataFrame]:
+    """Replaces numeric entries outside the given plausible ranges with NaN, chunk by chunk.
+
+    The ranges are usually computed with compute_plausible_ranges from sketches built in a first pass over the data
+    (see build_quantile_sketches).
+
+    :param chunks: The chunks of the dataframe, in order
+    :param ranges: For each column, the lower and upper bound of the plausible values
+    :param changelog: If given, every removed value is logged to this changelog
+    :return: The cleaned chunks
+    """
+    for chunk in chunks:
+        is_implausible = identify_implausible_values(chunk, ranges)
+        for column in ranges:
+            if column not in chunk or not is_implausible[column].any():
+                continue
+            if changelog is not None:
+                for row_idx, value in chunk[column][is_implausible[column]].items():
+                    changelog.add_entry(ChangedEntry(remove_implausible_values.__name__, column, row_idx,
+                                                     str(value), str(np.nan)))
+            chunk[column] = chunk[column].mask(is_implausible[column])
+        yield chunk
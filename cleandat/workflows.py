@@ -34,17 +34,21 @@ def remove_empty_columns_and_rows(df: DataFrame) -> DataFrame:
     return df
 
 
-def clean_date_entries(df: DataFrame, decompose_dates: bool = True, remove_unparsable=True) -> DataFrame:
+def clean_date_entries(df: DataFrame, decompose_dates: bool = True, remove_unparsable=True,
+                       n_workers: int = None, chunk_size: int = 1000) -> DataFrame:
     """Cleans and encodes date entries in a dataframe.
 
     :param decompose_dates: Whether date entries should be decomposed into _day, month, year columns, default true
     :param remove_unparsable: Whether unparsable date entries should be removed, default true
+    :param n_workers: If given, parse distinct date entries across this many worker processes, default None
+    :param chunk_size: Number of distinct date entries sent to a worker at once, default 1000
     :param df: The dataframe to be cleaned
     :return: The cleaned dataframe
 
     """
-    date_columns = identify_date_columns(df)
-    df = normalize_date_entries(df, date_columns, remove_unparsable=remove_unparsable)
+    date_columns = identify_date_columns(df, n_workers=n_workers, chunk_size=chunk_size)
+    df = normalize_date_entries(df, date_columns, remove_unparsable=remove_unparsable, n_workers=n_workers,
+                                chunk_size=chunk_size)
     if decompose_dates:
         df = decompose_date_entries(df, date_columns)
     return df
@@ -1,11 +1,14 @@
+import io
 import os
 from unittest import TestCase
 
 import numpy as np
 import pandas as pd
 
+from cleandat.changelog import ChangeLog
 from cleandat.cleanup import unify_number_format, clean_unknown_entries, \
-    remove_entries_with_inconsistent_datatypes
+    remove_entries_with_inconsistent_datatypes, identify_duplicate_rows, drop_duplicate_rows, \
+    drop_duplicate_rows_chunked
 
 
 class Test(TestCase):
@@ -36,4 +39,51 @@ class Test(TestCase):
 
     def test_remove_entries_with_inconsistent_datatypes(self):
         df_clean = remove_entries_with_inconsistent_datatypes(self.df, threshold=0.5)
-        self.assertEqual(pd.isna(df_clean['sex'])[19], True)
\ No newline at end of file
+        self.assertEqual(pd.isna(df_clean['sex'])[19], True)
+
+    df_visits = pd.DataFrame({'PID': [1, 1, 2, 1, 3, 2],
+                              'name': ['John Doe', 'John Doe', 'Jane', ' john  DOE', 'Max', np.nan],
+                              'visit': ['01.01.2020', '01.01.2020', '02.02.2020', '01.01.2020', '03.03.2020', np.nan]})
+
+    def test_identify_duplicate_rows_exact(self):
+        duplicates = identify_duplicate_rows(self.df_visits, normalize=False)
+        self.assertEqual([1], duplicates)
+
+    def test_identify_duplicate_rows_normalized(self):
+        duplicates = identify_duplicate_rows(self.df_visits)
+        self.assertEqual([1, 3], duplicates)
+
+    def test_identify_duplicate_rows_returns_positions(self):
+        df = self.df_visits.set_index(pd.Index([5, 5, 4, 4, 3, 3]))
+        self.assertEqual([1, 3], identify_duplicate_rows(df))
+
+    def test_identify_duplicate_rows_key_columns(self):
+        duplicates = identify_duplicate_rows(self.df_visits, ['PID'])
+        self.assertEqual([1, 3, 5], duplicates)
+
+    def test_drop_duplicate_rows(self):
+        df_clean = drop_duplicate_rows(self.df_visits.copy())
+        self.assertEqual([0, 2, 4, 5], df_clean.index.tolist())
+
+    def test_drop_duplicate_rows_non_unique_index(self):
+        df = pd.DataFrame({'a': [1, 1, 2, 3]}, index=[0, 1, 1, 2])
+        df_clean = drop_duplicate_rows(df)
+        self.assertEqual([1, 2, 3], df_clean['a'].tolist())
+        self.assertEqual([0, 1, 2], df_clean.index.tolist())
+
+    def test_drop_duplicate_rows_chunked(self):
+        changelog = ChangeLog()
+        chunks = [self.df_visits.iloc[:2].copy(), self.df_visits.iloc[2:4].copy(), self.df_visits.iloc[4:].copy()]
+        df_clean = pd.concat(drop_duplicate_rows_chunked(chunks, changelog=changelog))
+        self.assertEqual([0, 2, 4, 5], df_clean.index.tolist())
+        self.assertEqual([1, 3], [entry.row_index for entry in changelog.entries])
+
+    def test_drop_duplicate_rows_chunked_read_csv(self):
+        # chunks of read_csv infer their dtypes separately: int64 vs float64 (missing weight) and int64 vs object
+        # (non-numeric token in PID)
+        csv = 'PID,w,name\n1,70,John\n2,80,Jane\n1,70,John\n3,,Max\nn/a,70,John\n1,70.0,John\n'
+        df_clean = drop_duplicate_rows(pd.read_csv(io.StringIO(csv)))
+        chunks = pd.read_csv(io.StringIO(csv), chunksize=2)
+        df_clean_chunked = pd.concat(drop_duplicate_rows_chunked(chunks))
+        self.assertEqual([0, 1, 3, 4], df_clean.index.tolist())
+        self.assertEqual(df_clean.index.tolist(), df_clean_chunked.index.tolist())
@@ -5,7 +5,7 @@ from unittest import TestCase
 import pandas as pd
 
 from cleandat.date import identify_date_columns, normalize_date_entries, decompose_date_entries, \
-    create_durational_column
+    create_durational_column, parse_distinct_dates
 
 
 class Test(TestCase):
@@ -27,6 +27,24 @@ class Test(TestCase):
         self.assertEqual(df_cleaned['birth_date'][12], datetime(1990, 2, 2, 0, 0))
         self.assertEqual(df_cleaned['birth_date'][26], datetime(1999, 9, 9, 0, 0))
 
+    def test_identify_date_columns_parallel(self):
+        date_columns = identify_date_columns(self.df.copy(), n_workers=2, chunk_size=4)
+        self.assertEqual(['birth_date'], date_columns)
+
+    def test_clean_date_entries_parallel(self):
+        df_cleaned = normalize_date_entries(self.df.copy(), ['birth_date'], n_workers=2, chunk_size=4)
+        self.assertEqual(pd.isna(df_cleaned['birth_date'])[10], True)
+        self.assertEqual(df_cleaned['birth_date'][9], datetime(2020, 4, 12, 0, 0))
+        self.assertEqual(df_cleaned['birth_date'][26], datetime(1999, 9, 9, 0, 0))
+
+    def test_parse_distinct_dates(self):
+        values = ['01.02.2020', 'foo', '01.02.2020', 'June 4th, 2021']
+        parsed = parse_distinct_dates(values, {'DATE_ORDER': 'DMY'}, n_workers=2, chunk_size=1)
+        self.assertEqual(['01.02.2020', 'foo', 'June 4th, 2021'], list(parsed))
+        self.assertEqual(datetime(2020, 2, 1, 0, 0), parsed['01.02.2020'])
+        self.assertEqual(None, parsed['foo'])
+        self.assertEqual(datetime(2021, 6, 4, 0, 0), parsed['June 4th, 2021'])
+
     def test_decompose_date_entries(self):
         df_dates_clean = pd.read_csv(os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources",
                                                   'test_dates_cleaned.csv'))
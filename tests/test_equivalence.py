@@ -0,0 +1,189 @@
+import io
+import os
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from cleandat.cleanup import drop_duplicate_rows, drop_duplicate_rows_chunked
+from cleandat.date import identify_date_columns, normalize_date_entries
+from cleandat.plausibility import remove_implausible_values
+
+# Differential tests: every accelerated implementation is compared against a straightforward reference
+# implementation (the per-cell / plain pandas way of doing the same thing) on seeded randomized messy inputs,
+# on large synthetic inputs and on the fixtures in tests/resources.
+
+SEEDS = range(10)
+LARGE_NUM_ROWS = 50000
+# dateparser is slow, the date reference implementations parse every single entry
+DATE_SEEDS = range(3)
+DATE_LARGE_NUM_ROWS = 1000
+
+NAMES = ['John Doe', 'Jane Roe', 'Max Mustermann', 'Erika Musterfrau']
+RELATIVE_DATES = ['yesterday', '2 days ago']
+DATES = ['01.01.2020', '2020-01-01', 'January 1st, 2020', '12/04/2020', '04.06.2021', 'not a date'] + RELATIVE_DATES
+
+
+def generate_messy_dataframe(seed: int, num_rows: int = 200) -> DataFrame:
+    """Generates a dataframe with the kind of noise found in merged clinical exports: repeated records, whitespace
+    and case variations of strings, missing values, implausible numbers, columns without spread (constant or 0/1
+    encoded) and unparsable dates.
+
+    :param seed: Seed of the random number generator, the same seed always yields the same dataframe
+    :param num_rows: Number of rows of the dataframe
+    :return: The generated dataframe
+    """
+    rng = np.random.default_rng(seed)
+    names = rng.choice(NAMES, num_rows).astype(object)
+    # whitespace and case variations
+    varied = rng.random(num_rows) < 0.2
+    names[varied] = [_vary_string(name, rng) for name in names[varied]]
+    names[rng.random(num_rows) < 0.05] = np.nan
+    weight = rng.normal(75, 12, num_rows).round(1)
+    weight[rng.random(num_rows) < 0.02] *= 100
+    weight[rng.random(num_rows) < 0.05] = np.nan
+    df = pd.DataFrame({'PID': rng.integers(0, num_rows // 4 + 1, num_rows),
+                       'name': names,
+                       'visit': rng.choice(DATES, num_rows).astype(object),
+                       'weight': weight,
+                       'age': rng.integers(-5, 130, num_rows),
+                       'constant': np.full(num_rows, 3),
+                       'flag': (rng.random(num_rows) < 0.1).astype(int)})
+    # repeat some of the records as they are
+    repeated = df.sample(frac=0.1, random_state=seed)
+    return pd.concat([df, repeated]).sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def _vary_string(value: str, rng: np.random.Generator) -> str:
+    value = value.upper() if rng.random() < 0.5 else value.lower()
+    return ' ' * rng.integers(0, 3) + value.replace(' ', ' ' * rng.integers(1, 4)) + ' ' * rng.integers(0, 3)
+
+
+def load_fixture() -> DataFrame:
+    return pd.read_csv(os.path.join(os.path.dirname(os.path.realpath(__file__)), "resources", 'test.csv'))
+
+
+def reference_drop_duplicate_rows(df: DataFrame, columns: list[str] = None, normalize: bool = True) -> DataFrame:
+    keys = df if columns is None else df[columns]
+    if normalize:
+        keys = keys.apply(lambda column: column.apply(
+            lambda x: ' '.join(x.split()).casefold() if isinstance(x, str) else x))
+    return df[~keys.duplicated(keep='first')]
+
+
+def reference_remove_implausible_values(df: DataFrame, columns: list[str]) -> DataFrame:
+    for column in columns:
+        q1, q3 = np.nanquantile(df[column], [0.25, 0.75])
+        # columns without spread are left untouched
+        if q3 == q1:
+            continue
+        lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        df[column] = df[column].apply(lambda x: np.nan if x < lower or x > upper else x)
+    return df
+
+
+class Test(TestCase):
+
+    def inputs(self):
+        for seed in SEEDS:
+            yield f'seed={seed}', generate_messy_dataframe(seed)
+        yield 'large', generate_messy_dataframe(0, LARGE_NUM_ROWS)
+        yield 'fixture', load_fixture()
+        # merged exports without a reset index contain repeated index labels
+        yield 'non-unique index', pd.concat([generate_messy_dataframe(0), generate_messy_dataframe(1)])
+
+    def test_generate_messy_dataframe_is_seeded(self):
+        pd.testing.assert_frame_equal(generate_messy_dataframe(3), generate_messy_dataframe(3))
+
+    def test_drop_duplicate_rows(self):
+        for name, df in self.inputs():
+            for normalize in [False, True]:
+                with self.subTest(input=name, normalize=normalize):
+                    pd.testing.assert_frame_equal(reference_drop_duplicate_rows(df.copy(), normalize=normalize),
+                                                  drop_duplicate_rows(df.copy(), normalize=normalize))
+
+    def test_drop_duplicate_rows_key_columns(self):
+        for name, df in self.inputs():
+            with self.subTest(input=name):
+                columns = df.columns[:2].tolist()
+                pd.testing.assert_frame_equal(reference_drop_duplicate_rows(df.copy(), columns),
+                                              drop_duplicate_rows(df.copy(), columns))
+
+    def csv_inputs(self):
+        for name, df in self.inputs():
+            yield name, df, len(df) // 7 + 1
+        # missing values in only some chunks turn an integer column into float64 in those chunks only, a non-numeric
+        # token turns it into object
+        df = generate_messy_dataframe(0)
+        df['age'] = df['age'].astype('Int64')
+        df.loc[len(df) - 3:, 'age'] = np.nan
+        df['PID'] = df['PID'].astype(object)
+        df.loc[100, 'PID'] = 'unknown'
+        yield 'dtypes differ between chunks', df, 25
+
+    def test_drop_duplicate_rows_chunked(self):
+        # chunks as they are produced in practice: by pd.read_csv(chunksize=...), inferring dtypes per chunk
+        for name, df, chunk_size in self.csv_inputs():
+            with self.subTest(input=name):
+                csv = df.to_csv(index=False)
+                reference = reference_drop_duplicate_rows(pd.read_csv(io.StringIO(csv)))
+                chunks = pd.read_csv(io.StringIO(csv), chunksize=chunk_size)
+                pd.testing.assert_index_equal(reference.index, pd.concat(drop_duplicate_rows_chunked(chunks)).index)
+
+    def test_drop_duplicate_rows_deviation_stringified_values(self):
+        # intended deviation: numeric entries are hashed by their value independent of their dtype, so 5, 5.0 and '5'
+        # are considered duplicates, while the reference keeps '5' apart from the numbers
+        df = pd.DataFrame({'PID': pd.Series([5, 5.0, '5'], dtype=object)})
+        self.assertEqual(2, len(reference_drop_duplicate_rows(df.copy(), normalize=False)))
+        self.assertEqual(1, len(drop_duplicate_rows(df.copy(), normalize=False)))
+
+    def test_remove_implausible_values(self):
+        # intended deviation: the bounds are taken from the bucket edges of a quantile sketch with a relative accuracy
+        # of 1%, so they contain the exact bounds - values close to them may be kept, but never additionally removed
+        for name, df in self.inputs():
+            columns = df.select_dtypes('number').dropna(axis=1, how='all').columns.tolist()
+            reference = reference_remove_implausible_values(df.copy(), columns)
+            accelerated = remove_implausible_values(df.copy(), columns)
+            for column in columns:
+                with self.subTest(input=name, column=column):
+                    self.assertFalse((accelerated[column].isna() & reference[column].notna()).any())
+                    values = df[column].to_numpy()
+                    q1, median, q3 = np.nanquantile(values, [0.25, 0.5, 0.75])
+                    differs = (reference[column].isna() != accelerated[column].isna()).to_numpy()
+                    # values equal to one of the exact quantiles are always treated like the reference does
+                    self.assertFalse((differs & np.isin(values, [q1, median, q3])).any())
+                    # a spread within the sketch accuracy may not be detected at all, then the column is left untouched
+                    if differs.any() and q3 - q1 > 0.03 * max(abs(q1), abs(q3)):
+                        exact_bounds = np.array([q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)])
+                        tolerance = 0.06 * (abs(q1) + abs(q3))
+                        distance = np.abs(values[differs][:, None] - exact_bounds).min(axis=1)
+                        self.assertTrue((distance <= tolerance).all())
+
+    def date_inputs(self):
+        for seed in DATE_SEEDS:
+            yield f'seed={seed}', generate_messy_dataframe(seed)
+        yield 'large', generate_messy_dataframe(0, DATE_LARGE_NUM_ROWS)
+        yield 'fixture', load_fixture()
+
+    def test_identify_date_columns_parallel(self):
+        for name, df in self.date_inputs():
+            with self.subTest(input=name):
+                self.assertEqual(identify_date_columns(df.copy()),
+                                 identify_date_columns(df.copy(), n_workers=2, chunk_size=3))
+
+    def test_normalize_date_entries_parallel(self):
+        # intended deviation: relative dates are evaluated relative to the time of parsing, which the reference does
+        # for every entry, while each distinct entry is only parsed once in parallel
+        for name, df in self.date_inputs():
+            date_columns = [column for column in ['visit', 'birth_date'] if column in df]
+            is_relative = df[date_columns].isin(RELATIVE_DATES).any(axis=1)
+            for remove_unparsable in [False, True]:
+                with self.subTest(input=name, remove_unparsable=remove_unparsable):
+                    reference = normalize_date_entries(df.copy(), date_columns, remove_unparsable=remove_unparsable)
+                    accelerated = normalize_date_entries(df.copy(), date_columns, remove_unparsable=remove_unparsable,
+                                                         n_workers=2, chunk_size=3)
+                    pd.testing.assert_frame_equal(reference[~is_relative], accelerated[~is_relative])
+                    for column in date_columns:
+                        difference = accelerated[column][is_relative] - reference[column][is_relative]
+                        self.assertTrue((difference.abs() < pd.Timedelta(minutes=1)).all())
@@ -4,6 +4,7 @@ from unittest import TestCase
 import pandas as pd
 
 from cleandat.pipeline import TransformationPipeline
+from cleandat.cleanup import drop_duplicate_rows
 from cleandat.date import normalize_date_entries
 
 
@@ -17,4 +18,19 @@ class Test(TestCase):
         pipeline = TransformationPipeline(self.df)
         pipeline.add_task(normalize_date_entries, ['birth_date'])
         pipeline.run()
-        pipeline.print_changelog()
\ No newline at end of file
+        pipeline.print_changelog()
+
+    def test_pipeline_removed_rows(self):
+        df = pd.DataFrame({'PID': [1, 1, 2], 'name': ['John', 'john ', 'Jane']})
+        pipeline = TransformationPipeline(df)
+        pipeline.add_task(drop_duplicate_rows, ['PID', 'name'])
+        pipeline.run()
+        self.assertEqual(1, len(pipeline.changelog.entries))
+        self.assertEqual(1, pipeline.changelog.entries[0].row_index)
+        self.assertEqual('removed', pipeline.changelog.entries[0].value_after)
+
+    def test_pipeline_removed_rows_non_unique_index(self):
+        df = pd.DataFrame({'PID': [1, 1, 2]}, index=[0, 1, 1])
+        pipeline = TransformationPipeline(df)
+        pipeline.add_task(drop_duplicate_rows, ['PID'])
+        self.assertRaises(ValueError, pipeline.run)
@@ -0,0 +1,90 @@
+import io
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from cleandat.changelog import ChangeLog
+from cleandat.plausibility import QuantileSketch, build_quantile_sketches, compute_plausible_ranges, \
+    identify_implausible_values, remove_implausible_values, remove_implausible_values_chunked
+
+
+class Test(TestCase):
+
+    df = pd.DataFrame({'weight': [70, 80, 75, 7000, 65, 72, np.nan, 68],
+                       'age': [30, 40, -5, 50, 60, 'n/a', 20, 45]})
+
+    def test_quantile_sketch(self):
+        values = np.random.default_rng(42).normal(70, 15, 10000)
+        sketch = QuantileSketch(relative_accuracy=0.01).update(values)
+        for q in [0.1, 0.25, 0.5, 0.75, 0.9]:
+            self.assertAlmostEqual(np.quantile(values, q), sketch.quantile(q), delta=0.02 * np.quantile(values, q))
+
+    def test_quantile_sketch_merge(self):
+        values = np.arange(-50, 100, dtype=float)
+        merged = QuantileSketch().update(values[:70]).merge(QuantileSketch().update(values[70:]))
+        single = QuantileSketch().update(values)
+        self.assertEqual(single.count, merged.count)
+        self.assertEqual(single.quantile(0.5), merged.quantile(0.5))
+
+    def test_quantile_bounds(self):
+        values = np.random.default_rng(7).normal(-20, 40, 5001)
+        sketch = QuantileSketch().update(values)
+        for q in [0.1, 0.25, 0.5, 0.75, 0.9]:
+            lower, upper = sketch.quantile_bounds(q)
+            self.assertTrue(lower <= np.quantile(values, q) <= upper)
+        self.assertLessEqual(np.median(np.abs(values - np.median(values))), sketch.median_absolute_deviation_bound())
+
+    def test_identify_implausible_values(self):
+        ranges = compute_plausible_ranges(build_quantile_sketches([self.df]), clinical_ranges={'age': (0, 120)})
+        is_implausible = identify_implausible_values(self.df, ranges)
+        self.assertEqual([3], self.df.index[is_implausible['weight']].tolist())
+        self.assertEqual([2], self.df.index[is_implausible['age']].tolist())
+
+    def test_remove_implausible_values(self):
+        df_clean = remove_implausible_values(self.df.copy())
+        self.assertEqual(True, pd.isna(df_clean['weight'][3]))
+        self.assertEqual(70, df_clean['weight'][0])
+        # age is not numeric and was not selected
+        self.assertEqual(-5, df_clean['age'][2])
+
+    def test_remove_implausible_values_mad_and_clinical_ranges(self):
+        df_clean = remove_implausible_values(self.df.copy(), ['weight', 'age'], method='mad',
+                                             clinical_ranges={'age': (0, 120)})
+        self.assertEqual(True, pd.isna(df_clean['weight'][3]))
+        self.assertEqual(True, pd.isna(df_clean['age'][2]))
+        # non-numeric entries are left to remove_entries_with_inconsistent_datatypes
+        self.assertEqual('n/a', df_clean['age'][5])
+
+    def test_remove_implausible_values_chunked(self):
+        chunks = [self.df.iloc[:4].copy(), self.df.iloc[4:].copy()]
+        ranges = compute_plausible_ranges(build_quantile_sketches(chunks, ['weight']))
+        changelog = ChangeLog()
+        df_clean = pd.concat(remove_implausible_values_chunked(chunks, ranges, changelog=changelog))
+        self.assertEqual(True, pd.isna(df_clean['weight'][3]))
+        self.assertEqual(1, len(changelog.entries))
+        self.assertEqual('7000.0', changelog.entries[0].value_before)
+
+    def test_remove_implausible_values_constant_column(self):
+        for method in ['iqr', 'mad']:
+            df_clean = remove_implausible_values(pd.DataFrame({'count': [3] * 10}), method=method)
+            self.assertEqual([3] * 10, df_clean['count'].tolist())
+
+    def test_remove_implausible_values_binary_column(self):
+        df = pd.DataFrame({'flag': [1, 1, 1, 1, 1, 1, 0, 1], 'w': [70, 70, 70, 70, 70, 70, 71, 90]})
+        for method in ['iqr', 'mad']:
+            df_clean = remove_implausible_values(df.copy(), method=method)
+            pd.testing.assert_frame_equal(df, df_clean)
+
+    def test_build_quantile_sketches_read_csv_chunks(self):
+        # the first chunk reads weight as text because of the 'unknown' token
+        csv = 'weight,name\nunknown,a\n70,b\n80,c\n75,d\n'
+        sketches = build_quantile_sketches(pd.read_csv(io.StringIO(csv), chunksize=2))
+        self.assertEqual(['weight'], list(sketches))
+        self.assertEqual(3, sketches['weight'].count)
+
+    def test_build_quantile_sketches_missing_column(self):
+        chunks = [pd.DataFrame({'weight': [70, 80]}), pd.DataFrame({'age': [30]})]
+        sketches = build_quantile_sketches(chunks, ['weight', 'age'])
+        self.assertEqual(2, sketches['weight'].count)
+        self.assertEqual(1, sketches['age'].count)
@@ -16,3 +16,9 @@ class Test(TestCase):
         df_clean = clean_date_entries(self.df)
         self.assertEqual(pd.isna(df_clean['birth_date_year'])[10], True)
         self.assertEqual(pd.isna(df_clean['birth_date_year'])[13], True)
+
+    def test_clean_date_entries_parallel(self):
+        df_clean = clean_date_entries(self.df.copy(), n_workers=2, chunk_size=4)
+        self.assertEqual(pd.isna(df_clean['birth_date_year'])[10], True)
+        self.assertEqual(pd.isna(df_clean['birth_date_year'])[13], True)
+        self.assertEqual(df_clean['birth_date_year'][9], 2020)